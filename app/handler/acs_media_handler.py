@@ -1,14 +1,22 @@
 """Handles media streaming to Azure Voice Live API via WebSocket."""
 
 import asyncio
-import base64
+import hashlib
+import html
 import json
 import logging
 import uuid
 import os
+import string
 import aiomysql
+import orjson
+import pybase64
 import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
 
+import redis.asyncio as redis
 from azure.identity.aio import ManagedIdentityCredential
 from azure.communication.email.aio import EmailClient
 from websockets.asyncio.client import connect as ws_connect
@@ -16,88 +24,276 @@ from websockets.typing import Data
 
 logger = logging.getLogger(__name__)
 
+# orjson is used on the Voice Live WebSocket path; it returns bytes, which are
+# sent as text frames without an intermediate str
+_dumps = orjson.dumps
+_loads = orjson.loads
+# Voice Live deltas are canonical base64, so the alphabet check is skipped
+_b64decode = pybase64.b64decode
+
+# Envelope for input_audio_buffer.append. Base64 is JSON-safe, so audio frames are
+# framed by concatenation instead of running the JSON encoder every ~20 ms
+_APPEND_PREFIX = b'{"type":"input_audio_buffer.append","audio":"'
+_APPEND_SUFFIX = b'"}'
+
+# Messages to ACS and the browser must stay str: Quart sends bytes as binary
+# frames, which neither side parses as JSON
+_STOP_AUDIO_JSON = _dumps({"Kind": "StopAudio", "AudioData": None, "StopAudio": {}}).decode()
+_AUDIO_PREFIX = '{"Kind":"AudioData","AudioData":{"Data":"'
+_AUDIO_SUFFIX = '"},"StopAudio":null}'
+# Audio frames buffered for a slow client before the oldest is dropped (~1.3 s at 20 ms)
+_TX_AUDIO_FRAMES = 64
+
+# --- Configuration, read and validated once at import ---
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """Handler settings loaded from the environment (.env)."""
+
+    mysql_host: str | None
+    mysql_user: str | None
+    mysql_password: str | None
+    mysql_db: str | None
+    acs_conn: str | None
+    acs_sender: str
+    redis_url: str | None
+    mysql_ready: bool
+    mysql_pool_min: int = 1
+    mysql_pool_max: int = 4
+
+    @classmethod
+    def from_env(cls):
+        """Builds the settings from environment variables."""
+        # The following parameters must be defined in the .env file:
+        # MYSQL_HOST, MYSQL_USER, MYSQL_PASSWORD, MYSQL_DB
+        mysql = [os.getenv(name) for name in ("MYSQL_HOST", "MYSQL_USER", "MYSQL_PASSWORD", "MYSQL_DB")]
+        return cls(
+            *mysql,
+            acs_conn=os.getenv("ACS_CONNECTION_STRING"),
+            acs_sender=os.getenv("ACS_SENDER_EMAIL", "donotreply@your-domain.azurecomm.net"),
+            redis_url=os.getenv("REDIS_URL") or None,
+            mysql_ready=all(mysql),
+            # Per process: every Hypercorn worker opens its own pool
+            mysql_pool_min=int(os.getenv("MYSQL_POOL_MIN", "1")),
+            mysql_pool_max=int(os.getenv("MYSQL_POOL_MAX", "4")),
+        )
+
+
+SETTINGS = Settings.from_env()
+if not SETTINGS.mysql_ready:
+    logger.warning("⚠️ Missing MySQL environment variables: client lookup and support case tools are disabled")
+
+# Long-lived ACS email client, reused across sends and closed on app shutdown
+_EMAIL_CLIENT = (
+    EmailClient.from_connection_string(SETTINGS.acs_conn) if SETTINGS.acs_conn else None
+)
+# Strong references to in-flight background email sends so they aren't garbage collected
+_bg_tasks = set()
+
+# --- Shared MySQL connection pool ---
+# Created lazily on first use so every tool call reuses warm connections instead of
+# paying the TCP + auth handshake of a fresh aiomysql.connect(). Autocommit stays on:
+# aiomysql drops connections released mid-transaction, which would defeat the pool.
+_POOL = None
+_POOL_LOCK = asyncio.Lock()
+
+
+async def get_pool():
+    """
+    Get the shared aiomysql pool, creating it on first use.
+    """
+    global _POOL
+    if _POOL is None:
+        async with _POOL_LOCK:
+            if _POOL is None:
+                logger.info("📋 Creating MySQL pool: %s/%s", SETTINGS.mysql_host, SETTINGS.mysql_db)
+                _POOL = await aiomysql.create_pool(
+                    host=SETTINGS.mysql_host,
+                    user=SETTINGS.mysql_user,
+                    password=SETTINGS.mysql_password,
+                    db=SETTINGS.mysql_db,
+                    minsize=SETTINGS.mysql_pool_min,
+                    maxsize=SETTINGS.mysql_pool_max,
+                    autocommit=True,
+                    pool_recycle=1800,
+                )
+                logger.info("✅ MySQL pool created")
+    return _POOL
+
+
+async def close_pool():
+    """
+    Close the shared aiomysql pool, if it was created.
+    """
+    global _POOL
+    if _POOL is not None:
+        _POOL.close()
+        await _POOL.wait_closed()
+        _POOL = None
+        logger.info("MySQL pool closed")
+
+
+# --- SQL statements ---
+# Fixed statement text, always bound through %s parameters. Never interpolate values
+# into these strings: every call must send the same SQL so server-side statement
+# caching and per-digest stats keep treating each one as a single query.
+_EMAIL_QUERY = "SELECT email, name FROM clients WHERE client_id = %s"
+_CLIENT_QUERY = "SELECT id, name FROM clients WHERE client_id = %s"
+_PRODUCTS_QUERY = '''
+    SELECT c.name as client_name, p.name as product_name, p.type
+    FROM clients c
+    JOIN client_products cp ON c.id = cp.client_id
+    JOIN products p ON cp.product_id = p.id
+    WHERE c.client_id = %s
+'''
+_OPEN_CASES_QUERY = '''
+    SELECT sc.id, sc.description, sc.status, sc.created_date
+    FROM support_cases sc
+    JOIN clients c ON sc.client_id = c.id
+    WHERE c.client_id = %s AND sc.status IN ('open', 'in_progress')
+    ORDER BY sc.created_date DESC
+'''
+_INSERT_CASE_QUERY = '''
+    INSERT INTO support_cases (client_id, description, status)
+    VALUES (%s, %s, 'open')
+'''
+
+
+# --- Optional Redis read-through cache ---
+# Enabled by setting REDIS_URL. Cache failures are logged and fall back to MySQL.
+_REDIS = None
+
+
+def _get_redis():
+    """
+    Get the shared Redis client, or None when REDIS_URL is not configured.
+    """
+    global _REDIS
+    if _REDIS is None and SETTINGS.redis_url:
+        _REDIS = redis.from_url(SETTINGS.redis_url, decode_responses=True)
+    return _REDIS
+
+
+async def _cache_get(key):
+    """
+    Return the cached JSON value for a key, or None on a miss or cache error.
+    """
+    r = _get_redis()
+    if r is None:
+        return None
+    try:
+        val = await r.get(key)
+        return _loads(val) if val else None
+    except Exception as e:
+        logger.warning("⚠️ Redis get failed for %s: %s", key, e)
+        return None
+
+
+async def _cache_set(key, value, ttl):
+    """
+    Store a JSON-serializable value under a key for ttl seconds.
+    """
+    r = _get_redis()
+    if r is None:
+        return
+    try:
+        await r.set(key, _dumps(value), ex=ttl)
+    except Exception as e:
+        logger.warning("⚠️ Redis set failed for %s: %s", key, e)
+
+
+async def _cache_delete(*keys):
+    """
+    Remove keys from the cache.
+    """
+    r = _get_redis()
+    if r is None:
+        return
+    try:
+        await r.delete(*keys)
+    except Exception as e:
+        logger.warning("⚠️ Redis delete failed for %s: %s", keys, e)
+
+
+async def close_redis():
+    """
+    Close the shared Redis client, if it was created.
+    """
+    global _REDIS
+    if _REDIS is not None:
+        await _REDIS.aclose()
+        _REDIS = None
+        logger.info("Redis client closed")
+
+
+async def close_email_client():
+    """
+    Close the shared ACS email client once pending background sends have finished.
+    """
+    if _bg_tasks:
+        await asyncio.gather(*_bg_tasks, return_exceptions=True)
+    if _EMAIL_CLIENT is not None:
+        await _EMAIL_CLIENT.close()
+        logger.info("Email client closed")
+
 
 # --- Function to get client email by ID number ---
 async def get_client_email_by_client_id(client_id):
     """
     Get client email by their ID number.
     """
-    logger.info(f"📧 FUNCTION CALLED: Getting email for client ID: {client_id}")
-    
-    mysql_host = os.getenv("MYSQL_HOST")
-    mysql_user = os.getenv("MYSQL_USER")
-    mysql_password = os.getenv("MYSQL_PASSWORD")
-    mysql_db = os.getenv("MYSQL_DB")
+    logger.info("📧 FUNCTION CALLED: Getting email for client ID: %s", client_id)
     
-    if not all([mysql_host, mysql_user, mysql_password, mysql_db]):
+    if not SETTINGS.mysql_ready:
         logger.error("❌ ERROR: Missing MySQL environment variables")
         return None
     
-    logger.info(f"📋 Connecting to MySQL: {mysql_host}/{mysql_db}")
+    cache_key = f"client:email:{client_id}"
+    client = await _cache_get(cache_key)
+    if client:
+        logger.info("⚡ Email cache hit for client ID %s: %s", client_id, client['email'])
+        return client
     
     try:
-        conn = await aiomysql.connect(
-            host=mysql_host,
-            user=mysql_user,
-            password=mysql_password,
-            db=mysql_db,
-        )
-        logger.info("✅ MySQL connection established")
-        
-        async with conn.cursor(aiomysql.DictCursor) as cur:
-            await cur.execute("SELECT email, name FROM clients WHERE client_id = %s", (client_id,))
-            client = await cur.fetchone()
-            
-        conn.close()
+        pool = await get_pool()
+        async with pool.acquire() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cur:
+                await cur.execute(_EMAIL_QUERY, (client_id,))
+                client = await cur.fetchone()
         
         if client:
-            logger.info(f"📧 Email found for client ID {client_id}: {client['email']} (Client: {client['name']})")
+            logger.info("📧 Email found for client ID %s: %s (Client: %s)", client_id, client['email'], client['name'])
+            await _cache_set(cache_key, client, 300)
             return client
         else:
-            logger.info(f"❌ No client found with ID {client_id}")
+            logger.info("❌ No client found with ID %s", client_id)
             return None
         
     except Exception as e:
-        logger.error(f"❌ ERROR in email query: {str(e)}")
+        logger.error("❌ ERROR in email query: %s", e)
         return None
 
 
-# --- Function to send email with conversation summary ---
-async def send_support_summary_email(recipient_email, recipient_name, client_id, conversation_summary):
-    """
-    Send an email to the client with a summary of their conversation/support case.
-    """
-    logger.info(f"📨 FUNCTION CALLED: Sending summary email to {recipient_email} ({recipient_name})")
-    
-    connection_string = os.getenv("ACS_CONNECTION_STRING")
-    sender_address = os.getenv("ACS_SENDER_EMAIL", "donotreply@your-domain.azurecomm.net")
-    
-    POLLER_WAIT_TIME = 10
-    
-    # Generate unique case ID
-    case_id = str(uuid.uuid4())[:13]
-    
-    # HTML template
-    html_content = f"""<!DOCTYPE html>
+# HTML template for the summary email, parsed once at import
+_HTML_TEMPLATE = string.Template("""<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
-    <title>Conversation Summary {case_id}</title>
+    <title>Conversation Summary $case_id</title>
 </head>
 <body style="font-family: Arial, sans-serif; color: #333; line-height: 1.6;">
-    <p>Dear <strong>{recipient_name}</strong>,</p>
+    <p>Dear <strong>$recipient_name</strong>,</p>
     <p>Thank you for contacting us. Please find below a summary of our conversation today for your reference.</p>
     
     <h3 style="color: #005f75;">Client Details:</h3>
     <ul>
-        <li><strong>Client ID:</strong> {client_id}</li>
-        <li><strong>Name:</strong> {recipient_name}</li>
-        <li><strong>Email:</strong> {recipient_email}</li>
+        <li><strong>Client ID:</strong> $client_id</li>
+        <li><strong>Name:</strong> $recipient_name</li>
+        <li><strong>Email:</strong> $recipient_email</li>
     </ul>
     
     <h3 style="color: #005f75;">Conversation Summary:</h3>
     <div style="background-color: #f9f9f9; padding: 15px; border-left: 4px solid #005f75;">
-        {conversation_summary}
+        $conversation_summary
     </div>
     
     <p>If you have any additional questions or need more information, please don't hesitate to contact us.</p>
@@ -108,72 +304,123 @@ async def send_support_summary_email(recipient_email, recipient_name, client_id,
     <p>We remain at your disposal and appreciate the opportunity to assist you.</p>
     <p>Best regards,<br><strong>The Support Team</strong></p>
 </body>
-</html>"""
+</html>""")
 
-    message = {
-        "senderAddress": sender_address,
-        "recipients": {
-            "to": [{"address": recipient_email}],
-        },
-        "content": {
-            "subject": f"Conversation Summary {case_id}",
-            "html": html_content
-        }
-    }
+
+# --- Function to send email with conversation summary ---
+async def send_support_summary_email(recipient_email, recipient_name, client_id, conversation_summary, case_id=None):
+    """
+    Send an email to the client with a summary of their conversation/support case.
+    """
+    logger.info("📨 FUNCTION CALLED: Sending summary email to %s (%s)", recipient_email, recipient_name)
+    
+    # Generate unique case ID
+    if case_id is None:
+        case_id = uuid.uuid4().hex[:13]
+    
+    if _EMAIL_CLIENT is None:
+        logger.error("❌ ERROR: Missing ACS_CONNECTION_STRING for email client")
+        return {"success": False, "error": "Missing ACS_CONNECTION_STRING for email client"}
 
     try:
-        client = EmailClient.from_connection_string(connection_string)
+        html_content = _HTML_TEMPLATE.substitute(
+            case_id=case_id,
+            recipient_name=html.escape(str(recipient_name)),
+            client_id=html.escape(str(client_id)),
+            recipient_email=html.escape(str(recipient_email)),
+            conversation_summary=html.escape(str(conversation_summary)),
+        )
+
+        message = {
+            "senderAddress": SETTINGS.acs_sender,
+            "recipients": {
+                "to": [{"address": recipient_email}],
+            },
+            "content": {
+                "subject": f"Conversation Summary {case_id}",
+                "html": html_content
+            }
+        }
+
         logger.info("📤 Initiating email send...")
-        poller = await client.begin_send(message)
+        poller = await _EMAIL_CLIENT.begin_send(message)
         
         # Don't wait for result, just send and return
-        logger.info(f"✅ Email sent (in progress). Operation initiated.")
-        await client.close()  # Close client connection
+        logger.info("✅ Email sent (in progress). Operation initiated.")
         
         return {"success": True, "operation_id": "pending", "case_id": case_id}
             
     except Exception as ex:
-        logger.error(f"❌ Exception sending email: {ex}")
-        try:
-            await client.close()  # Close connection on error
-        except:
-            pass
+        logger.error("❌ Exception sending email: %s", ex)
         return {"success": False, "error": str(ex)}
 
 
+def _on_bg_task_done(task):
+    """
+    Forget a finished background task, logging any error it raised: nobody awaits it.
+    """
+    _bg_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("❌ Background task failed", exc_info=task.exception())
+
+
 # --- Function for the agent to send conversation summary ---
 async def send_conversation_summary(client_id, conversation_summary):
     """
     Function that the agent can call to send a conversation summary to the client.
     """
-    logger.info(f"🤖 FUNCTION CALLED: send_conversation_summary for client ID: {client_id}")
-    logger.info(f"📄 Summary: {conversation_summary}")
+    logger.info("🤖 FUNCTION CALLED: send_conversation_summary for client ID: %s", client_id)
+    logger.info("📄 Summary: %s", conversation_summary)
+    
+    if _EMAIL_CLIENT is None:
+        logger.error("❌ ERROR: Missing ACS_CONNECTION_STRING for email client")
+        return {"error": "Error sending email: Missing ACS_CONNECTION_STRING for email client"}
     
-    # First get the client's email
     client = await get_client_email_by_client_id(client_id)
     
     if not client or not client.get('email'):
-        logger.error(f"❌ Could not get email for client ID {client_id}")
+        logger.error("❌ Could not get email for client ID %s", client_id)
         return {"error": f"Client with ID {client_id} not found or no email registered"}
     
-    # Send the email
-    result = await send_support_summary_email(
-        client['email'], 
-        client['name'], 
-        client_id, 
-        conversation_summary
+    case_id = uuid.uuid4().hex[:13]
+    # Send the email in the background so the tool call doesn't wait on ACS
+    task = asyncio.create_task(
+        send_support_summary_email(
+            client['email'], 
+            client['name'], 
+            client_id, 
+            conversation_summary,
+            case_id=case_id,
+        )
     )
+    _bg_tasks.add(task)
+    task.add_done_callback(_on_bg_task_done)
     
-    if result.get('success'):
-        logger.info(f"✅ Summary sent successfully to {client['email']}")
-        return {
-            "message": f"Summary sent successfully to {client['name']} ({client['email']})",
-            "operation_id": result.get('operation_id'),
-            "case_id": result.get('case_id')
-        }
-    else:
-        logger.error(f"❌ Error sending summary: {result.get('error')}")
-        return {"error": f"Error sending email: {result.get('error')}"}
+    logger.info("✅ Summary being sent to %s", client['email'])
+    return {
+        "message": f"Summary being sent to {client['name']} ({client['email']})",
+        "case_id": case_id
+    }
+
+
+async def _fetch_client_products(pool, client_id):
+    """
+    Fetch the products contracted by a client on a dedicated pooled connection.
+    """
+    async with pool.acquire() as conn:
+        async with conn.cursor(aiomysql.DictCursor) as cur:
+            await cur.execute(_PRODUCTS_QUERY, (client_id,))
+            return await cur.fetchall()
+
+
+async def _fetch_open_cases(pool, client_id):
+    """
+    Fetch the open and in-progress support cases of a client on a dedicated pooled connection.
+    """
+    async with pool.acquire() as conn:
+        async with conn.cursor(aiomysql.DictCursor) as cur:
+            await cur.execute(_OPEN_CASES_QUERY, (client_id,))
+            return await cur.fetchall()
 
 
 # --- Function to get client products by ID ---
@@ -181,56 +428,33 @@ async def get_client_products_by_client_id(client_id):
     """
     Get products contracted by a client given their ID.
     """
-    logger.info(f"🔍 FUNCTION CALLED: Getting products for client ID: {client_id}")
+    logger.info("🔍 FUNCTION CALLED: Getting products for client ID: %s", client_id)
     
-    # The following parameters must be defined in the .env file:
-    # MYSQL_HOST, MYSQL_USER, MYSQL_PASSWORD, MYSQL_DB
-    mysql_host = os.getenv("MYSQL_HOST")
-    mysql_user = os.getenv("MYSQL_USER")
-    mysql_password = os.getenv("MYSQL_PASSWORD")
-    mysql_db = os.getenv("MYSQL_DB")
-    
-    if not all([mysql_host, mysql_user, mysql_password, mysql_db]):
+    if not SETTINGS.mysql_ready:
         logger.error("❌ ERROR: Missing MySQL environment variables")
         return {"error": "Missing MySQL environment variables for connection"}
     
-    logger.info(f"📋 Connecting to MySQL: {mysql_host}/{mysql_db}")
-    
     try:
-        conn = await aiomysql.connect(
-            host=mysql_host,
-            user=mysql_user,
-            password=mysql_password,
-            db=mysql_db,
-        )
-        logger.info("✅ MySQL connection established")
-        
-        async with conn.cursor(aiomysql.DictCursor) as cur:
-            query = '''
-                SELECT c.name as client_name, p.name as product_name, p.type
-                FROM clients c
-                JOIN client_products cp ON c.id = cp.client_id
-                JOIN products p ON cp.product_id = p.id
-                WHERE c.client_id = %s
-            '''
-            logger.info(f"🔍 Executing SQL query for client ID: {client_id}")
-            await cur.execute(query, (client_id,))
-            results = await cur.fetchall()
-            
-            # Query open support cases
-            cases_query = '''
-                SELECT sc.id, sc.description, sc.status, sc.created_date
-                FROM support_cases sc
-                JOIN clients c ON sc.client_id = c.id
-                WHERE c.client_id = %s AND sc.status IN ('open', 'in_progress')
-                ORDER BY sc.created_date DESC
-            '''
-            await cur.execute(cases_query, (client_id,))
-            open_cases = await cur.fetchall()
-            
-        conn.close()
+        pool = await get_pool()
+        # Products change rarely and are cached briefly; open cases are always read fresh
+        products_key = f"client:products:{client_id}"
+        cached_results = await _cache_get(products_key)
+        if cached_results is None:
+            logger.info("🔍 Executing SQL query for client ID: %s", client_id)
+            # Each query runs on its own pooled connection so both roundtrips overlap
+            results, open_cases = await asyncio.gather(
+                _fetch_client_products(pool, client_id),
+                _fetch_open_cases(pool, client_id),
+            )
+        else:
+            logger.info("⚡ Products cache hit for client ID: %s", client_id)
+            results = cached_results
+            open_cases = await _fetch_open_cases(pool, client_id)
         
         if results:
+            if cached_results is None:
+                await _cache_set(products_key, results, 60)
+
             # Extract client name (will be the same in all results)
             client_name = results[0]['client_name']
             # Create product list
@@ -242,12 +466,12 @@ async def get_client_products_by_client_id(client_id):
                 for result in results
             ]
             
-            logger.info(f"📊 RESULT: Client '{client_name}' has {len(products)} products")
+            logger.info("📊 RESULT: Client '%s' has %s products", client_name, len(products))
             
             for i, product in enumerate(products, 1):
-                logger.info(f"   {i}. {product['name']} (type: {product['type']})")
+                logger.info("   %s. %s (type: %s)", i, product['name'], product['type'])
             
-            logger.info(f"🎫 CASES: Client has {len(open_cases)} open/in-progress cases")
+            logger.info("🎫 CASES: Client has %s open/in-progress cases", len(open_cases))
             
             # Convert datetime dates to string for JSON serialization
             serializable_cases = []
@@ -269,7 +493,7 @@ async def get_client_products_by_client_id(client_id):
             return {"products": [], "open_cases": []}
         
     except Exception as e:
-        logger.error(f"❌ ERROR in MySQL query: {str(e)}")
+        logger.error("❌ ERROR in MySQL query: %s", e)
         return {"error": str(e)}
 
 
@@ -278,203 +502,285 @@ async def create_support_case(client_id, description):
     """
     Create a new support case for a client given their ID.
     """
-    logger.info(f"📝 FUNCTION CALLED: Creating support case for client ID: {client_id}")
-    logger.info(f"📄 Case description: {description}")
-    
-    mysql_host = os.getenv("MYSQL_HOST")
-    mysql_user = os.getenv("MYSQL_USER")
-    mysql_password = os.getenv("MYSQL_PASSWORD")
-    mysql_db = os.getenv("MYSQL_DB")
+    logger.info("📝 FUNCTION CALLED: Creating support case for client ID: %s", client_id)
+    logger.info("📄 Case description: %s", description)
     
-    if not all([mysql_host, mysql_user, mysql_password, mysql_db]):
+    if not SETTINGS.mysql_ready:
         logger.error("❌ ERROR: Missing MySQL environment variables")
         return {"error": "Missing MySQL environment variables for connection"}
     
-    logger.info(f"📋 Connecting to MySQL: {mysql_host}/{mysql_db}")
+    # Retried tool calls with the same client and description reuse the first result
+    description_hash = hashlib.blake2b((description or "").encode(), digest_size=16).hexdigest()
+    idempotency_key = f"idemp:case:{client_id}:{description_hash}"
+    previous = await _cache_get(idempotency_key)
+    if previous is not None:
+        logger.info("♻️ Duplicate request, returning existing support case #%s", previous['case_id'])
+        return previous
     
     try:
-        conn = await aiomysql.connect(
-            host=mysql_host,
-            user=mysql_user,
-            password=mysql_password,
-            db=mysql_db,
-        )
-        logger.info("✅ MySQL connection established")
+        pool = await get_pool()
+        async with pool.acquire() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cur:
+                # First find the client by ID
+                await cur.execute(_CLIENT_QUERY, (client_id,))
+                client = await cur.fetchone()
+                
+                if not client:
+                    logger.error("❌ Client with ID %s not found", client_id)
+                    return {"error": f"Client with ID {client_id} not found"}
+                
+                logger.info("👤 Client found: %s", client['name'])
+                
+                # Create the support case
+                await cur.execute(_INSERT_CASE_QUERY, (client['id'], description))
+                case_id = cur.lastrowid
         
-        async with conn.cursor(aiomysql.DictCursor) as cur:
-            # First find the client by ID
-            await cur.execute("SELECT id, name FROM clients WHERE client_id = %s", (client_id,))
-            client = await cur.fetchone()
-            
-            if not client:
-                logger.error(f"❌ Client with ID {client_id} not found")
-                return {"error": f"Client with ID {client_id} not found"}
-            
-            logger.info(f"👤 Client found: {client['name']}")
-            
-            # Create the support case
-            insert_query = '''
-                INSERT INTO support_cases (client_id, description, status)
-                VALUES (%s, %s, 'open')
-            '''
-            await cur.execute(insert_query, (client['id'], description))
-            case_id = cur.lastrowid
-            await conn.commit()
-            
-        conn.close()
-        logger.info(f"✅ Support case #{case_id} created successfully")
+        logger.info("✅ Support case #%s created successfully", case_id)
+        await _cache_delete(f"client:email:{client_id}", f"client:products:{client_id}")
         
-        return {
+        result = {
             "case_id": case_id,
             "client_name": client['name'],
             "description": description,
             "status": "open",
             "message": f"Support case #{case_id} created successfully for {client['name']}"
         }
+        await _cache_set(idempotency_key, result, 60)
+        return result
         
     except Exception as e:
-        logger.error(f"❌ ERROR creating support case: {str(e)}")
+        logger.error("❌ ERROR creating support case: %s", e)
         return {"error": str(e)}
 
 
-def session_config():
-    """Returns the default session configuration for Voice Live."""
-    return {
-        "type": "session.update",
-        "session": {
-            "instructions": "## Objective\nYou are a voice agent called 'Assistant', a customer service agent. \n\n## Main Functions:\n1. **Existing clients**: If they identify as a client, ask for their client ID and check their contracted products and open support cases using 'get_client_products_by_client_id'.\n2. **Support cases**: If a client requests to create a support case, use 'create_support_case' with their client ID and problem description.\n3. **General information**: If they are not a client, respond about general products and services.\n4. **Conversation summary**: BEFORE ending the call with an existing client, ALWAYS use 'send_conversation_summary' to send them an email summary of what was discussed in the conversation.\n\n## Personality and Tone\n- Warm, accessible and professional tone\n- Brief, natural and spoken responses in English\n- Don't use emojis, annotations, or parentheses\n\n## Flow Examples:\n**Client product inquiry:**\nUser: I'm a client and want to know my products.\nAssistant: Please provide me with your client ID.\nUser: 12345678A\nAssistant: (queries products and open cases)\n\n**Client creates support case:**\nUser: I want to report a problem.\nAssistant: Please provide me with your client ID and describe the problem.\nUser: 12345678A, my system is not working.\nAssistant: (creates support case)\n\n**Before hanging up with client:**\nAssistant: Before we finish, I'll send you a summary of our conversation to your email.\n(Calls send_conversation_summary with client ID and detailed summary)",
-            "tools": [
-                {
-                    "type": "function",
-                    "name": "get_client_products_by_client_id",
-                    "description": "Returns the client name, contracted products and open support cases given their client ID.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "client_id": {
-                                "type": "string",
-                                "description": "Client ID."
-                            }
-                        },
-                        "required": ["client_id"]
-                    }
-                },
-                {
-                    "type": "function",
-                    "name": "create_support_case",
-                    "description": "Creates a new support case for a client.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "client_id": {
-                                "type": "string",
-                                "description": "Client ID."
-                            },
-                            "description": {
-                                "type": "string",
-                                "description": "Detailed description of the client's problem or request."
-                            }
-                        },
-                        "required": ["client_id", "description"]
-                    }
-                },
-                {
-                    "type": "function",
-                    "name": "send_conversation_summary",
-                    "description": "Sends a conversation summary via email to the client. Only use with existing clients before ending the call.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "client_id": {
-                                "type": "string",
-                                "description": "Client ID."
-                            },
-                            "conversation_summary": {
-                                "type": "string",
-                                "description": "Detailed summary of the conversation, including reported problem, proposed solution and agreed next steps."
-                            }
-                        },
-                        "required": ["client_id", "conversation_summary"]
-                    }
+# Tools callable by the model, keyed by function name; each takes the parsed arguments dict
+_TOOL_HANDLERS: dict[str, Callable[[dict], Awaitable[dict]]] = {
+    "get_client_products_by_client_id": lambda a: get_client_products_by_client_id(a.get("client_id")),
+    "create_support_case": lambda a: create_support_case(a.get("client_id"), a.get("description")),
+    "send_conversation_summary": lambda a: send_conversation_summary(
+        a.get("client_id"), a.get("conversation_summary")
+    ),
+}
+
+
+# Default Voice Live session configuration, built and serialized once at import
+_SESSION_CONFIG = {
+    "type": "session.update",
+    "session": {
+        "instructions": "## Objective\nYou are a voice agent called 'Assistant', a customer service agent. \n\n## Main Functions:\n1. **Existing clients**: If they identify as a client, ask for their client ID and check their contracted products and open support cases using 'get_client_products_by_client_id'.\n2. **Support cases**: If a client requests to create a support case, use 'create_support_case' with their client ID and problem description.\n3. **General information**: If they are not a client, respond about general products and services.\n4. **Conversation summary**: BEFORE ending the call with an existing client, ALWAYS use 'send_conversation_summary' to send them an email summary of what was discussed in the conversation.\n\n## Personality and Tone\n- Warm, accessible and professional tone\n- Brief, natural and spoken responses in English\n- Don't use emojis, annotations, or parentheses\n\n## Flow Examples:\n**Client product inquiry:**\nUser: I'm a client and want to know my products.\nAssistant: Please provide me with your client ID.\nUser: 12345678A\nAssistant: (queries products and open cases)\n\n**Client creates support case:**\nUser: I want to report a problem.\nAssistant: Please provide me with your client ID and describe the problem.\nUser: 12345678A, my system is not working.\nAssistant: (creates support case)\n\n**Before hanging up with client:**\nAssistant: Before we finish, I'll send you a summary of our conversation to your email.\n(Calls send_conversation_summary with client ID and detailed summary)",
+        "tools": [
+            {
+                "type": "function",
+                "name": "get_client_products_by_client_id",
+                "description": "Returns the client name, contracted products and open support cases given their client ID.",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "client_id": {
+                            "type": "string",
+                            "description": "Client ID."
+                        }
+                    },
+                    "required": ["client_id"]
                 }
-            ],
-            "turn_detection": {
-                "type": "azure_semantic_vad",
-                "threshold": 0.3,
-                "prefix_padding_ms": 200,
-                "silence_duration_ms": 200,
-                "remove_filler_words": False,
             },
-            "input_audio_noise_reduction": {"type": "azure_deep_noise_suppression"},
-            "input_audio_echo_cancellation": {"type": "server_echo_cancellation"},
-            "voice": {
-                "name": "en-US-Ava:DragonHDLatestNeural",
-                "type": "azure-standard",
-                "temperature": 0.8,
+            {
+                "type": "function",
+                "name": "create_support_case",
+                "description": "Creates a new support case for a client.",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "client_id": {
+                            "type": "string",
+                            "description": "Client ID."
+                        },
+                        "description": {
+                            "type": "string",
+                            "description": "Detailed description of the client's problem or request."
+                        }
+                    },
+                    "required": ["client_id", "description"]
+                }
             },
+            {
+                "type": "function",
+                "name": "send_conversation_summary",
+                "description": "Sends a conversation summary via email to the client. Only use with existing clients before ending the call.",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "client_id": {
+                            "type": "string",
+                            "description": "Client ID."
+                        },
+                        "conversation_summary": {
+                            "type": "string",
+                            "description": "Detailed summary of the conversation, including reported problem, proposed solution and agreed next steps."
+                        }
+                    },
+                    "required": ["client_id", "conversation_summary"]
+                }
+            }
+        ],
+        "turn_detection": {
+            "type": "azure_semantic_vad",
+            "threshold": 0.3,
+            "prefix_padding_ms": 200,
+            "silence_duration_ms": 200,
+            "remove_filler_words": False,
         },
-    }
+        "input_audio_noise_reduction": {"type": "azure_deep_noise_suppression"},
+        "input_audio_echo_cancellation": {"type": "server_echo_cancellation"},
+        "voice": {
+            "name": "en-US-Ava:DragonHDLatestNeural",
+            "type": "azure-standard",
+            "temperature": 0.8,
+        },
+    },
+}
+_SESSION_CONFIG_JSON = _dumps(_SESSION_CONFIG)
+_RESPONSE_CREATE_JSON = _dumps({"type": "response.create"})
+
+
+def session_config():
+    """Returns the default session configuration for Voice Live."""
+    return _SESSION_CONFIG
+
+
+def _scan_acs_audio(frame):
+    """
+    Extracts (data, silent) from an ACS AudioData text frame with plain string scans.
+    Returns None when the frame is not in the compact shape ACS normally sends (extra
+    whitespace, escaped characters), so the caller can fall back to a full parse.
+    """
+    if '"kind":"AudioData"' not in frame[:64]:
+        return None
+    start = frame.find('"data":"')
+    if start < 0:
+        return None
+    start += 8
+    end = frame.find('"', start)
+    if end < 0:
+        return None
+    data = frame[start:end]
+    if "\\" in data:
+        return None
+    silent_at = frame.find('"silent":')
+    if silent_at < 0:
+        return None
+    silent_at += 9
+    if frame.startswith("false", silent_at):
+        return data, False
+    if frame.startswith("true", silent_at):
+        return data, True
+    return None
 
 
 class ACSMediaHandler:
     """Manages audio streaming between client and Azure Voice Live API."""
 
+    # Shared by all handlers so the managed-identity token is fetched once per hour,
+    # not once per connection
+    _credential = None
+    _token_cache = {"token": None, "exp": 0}
+
     def __init__(self, config):
         self.endpoint = config["AZURE_VOICE_LIVE_ENDPOINT"]
         self.model = config["VOICE_LIVE_MODEL"]
         self.api_key = config["AZURE_VOICE_LIVE_API_KEY"]
         self.client_id = config["AZURE_USER_ASSIGNED_IDENTITY_CLIENT_ID"]
-        self.send_queue = asyncio.Queue()
+        # URL and auth headers don't change between connects; only the request id and
+        # bearer token are added per connect
+        self._ws_url = (
+            f"{self.endpoint}/voice-live/realtime?api-version=2025-05-01-preview&model={self.model}"
+        ).replace("https://", "wss://")
+        self._static_headers = {} if self.client_id else {"api-key": self.api_key}
+        # Bounded so a stalled Voice Live socket applies backpressure to audio ingress
+        self.send_queue = asyncio.Queue(maxsize=256)
         self.ws = None
+        self.connect_task = None
         self.send_task = None
+        self._receiver_task = None
+        self._send_lock = asyncio.Lock()
+        self._tool_group = None
         self.incoming_websocket = None
         self.is_raw_audio = True
+        # Outbound (message, is_audio) queue to the client socket, drained by _writer_loop
+        # so the Voice Live receiver never waits on a slow client. Only audio frames are
+        # bounded; control messages (StopAudio, Transcription) are never dropped
+        self._tx = deque()
+        self._tx_audio = 0
+        self._tx_ready = asyncio.Event()
+        self._writer_task = None
+        # Voice Live event type -> handler coroutine, looked up once per received event
+        self._event_handlers = {
+            "session.created": self._on_session_created,
+            "input_audio_buffer.cleared": self._on_input_audio_buffer_cleared,
+            "input_audio_buffer.speech_started": self._on_speech_started,
+            "input_audio_buffer.speech_stopped": self._on_speech_stopped,
+            "conversation.item.input_audio_transcription.completed": self._on_input_transcription_completed,
+            "conversation.item.input_audio_transcription.failed": self._on_input_transcription_failed,
+            "response.done": self._on_response_done,
+            "response.function_call_arguments.done": self._on_function_call_arguments_done,
+            "response.audio_transcript.done": self._on_audio_transcript_done,
+            "response.audio.delta": self._on_audio_delta,
+            "error": self._on_error,
+        }
 
     def _generate_guid(self):
         return str(uuid.uuid4())
 
     async def connect(self):
         """Connects to Azure Voice Live API via WebSocket."""
-        url = f"{self.endpoint}/voice-live/realtime?api-version=2025-05-01-preview&model={self.model}"
-        url = url.replace("https://", "wss://")
-
-        headers = {"x-ms-client-request-id": self._generate_guid()}
-
+        headers = {**self._static_headers, "x-ms-client-request-id": self._generate_guid()}
         if self.client_id:
-            credential = ManagedIdentityCredential(
-                managed_identity_client_id=self.client_id
-            )
-            token = await credential.get_token(
-                "https://cognitiveservices.azure.com/.default"
-            )
-            headers["Authorization"] = f"Bearer {token.token}"
-        else:
-            headers["api-key"] = self.api_key
+            headers["Authorization"] = f"Bearer {await self._get_token()}"
 
-        self.ws = await ws_connect(url, additional_headers=headers)
+        self.ws = await ws_connect(self._ws_url, additional_headers=headers)
         logger.info("[VoiceLiveACSHandler] Connected to Voice Live API")
 
-        await self._send_json(session_config())
-        await self._send_json({"type": "response.create"})
+        await self._send_many([_SESSION_CONFIG_JSON, _RESPONSE_CREATE_JSON])
 
-        asyncio.create_task(self._receiver_loop())
+        self._receiver_task = asyncio.create_task(self._receiver_loop())
         self.send_task = asyncio.create_task(self._sender_loop())
 
+    async def _get_token(self):
+        """Returns the cached managed-identity token, refreshing it within 5 minutes of expiry."""
+        cache = ACSMediaHandler._token_cache
+        if cache["exp"] - time.time() < 300:
+            if ACSMediaHandler._credential is None:
+                ACSMediaHandler._credential = ManagedIdentityCredential(
+                    managed_identity_client_id=self.client_id
+                )
+            token = await ACSMediaHandler._credential.get_token(
+                "https://cognitiveservices.azure.com/.default"
+            )
+            cache.update(token=token.token, exp=token.expires_on)
+        return cache["token"]
+
     async def init_incoming_websocket(self, socket, is_raw_audio=True):
         """Sets up incoming ACS WebSocket."""
         self.incoming_websocket = socket
         self.is_raw_audio = is_raw_audio
+        self._writer_task = asyncio.create_task(self._writer_loop())
 
-    async def audio_to_voicelive(self, audio_b64: str):
-        """Queues audio data to be sent to Voice Live API."""
-        await self.send_queue.put(
-            json.dumps({"type": "input_audio_buffer.append", "audio": audio_b64})
-        )
+    async def audio_to_voicelive(self, audio_b64: bytes):
+        """Queues base64 audio (as ASCII bytes) to be sent to Voice Live API."""
+        # join() sizes the result once instead of building an intermediate prefix+audio copy
+        payload = b"".join((_APPEND_PREFIX, audio_b64, _APPEND_SUFFIX))
+        # Enqueue without awaiting in the common case; only wait when the sender falls behind
+        try:
+            self.send_queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            await self.send_queue.put(payload)
 
-    async def _send_json(self, obj):
-        """Sends a JSON object over WebSocket."""
+    async def _send_many(self, payloads):
+        """Sends several pre-serialized messages back to back without interleaving other control messages."""
         if self.ws:
-            await self.ws.send(json.dumps(obj))
+            async with self._send_lock:
+                for payload in payloads:
+                    await self.ws.send(payload, text=True)
 
     async def _sender_loop(self):
         """Continuously sends messages from the queue to the Voice Live WebSocket."""
@@ -482,228 +788,195 @@ class ACSMediaHandler:
             while True:
                 msg = await self.send_queue.get()
                 if self.ws:
-                    await self.ws.send(msg)
+                    await self.ws.send(msg, text=True)
         except Exception:
             logger.exception("[VoiceLiveACSHandler] Sender loop error")
 
     async def _receiver_loop(self):
         """Handles incoming events from the Voice Live WebSocket."""
+        handlers = self._event_handlers
         try:
-            async for message in self.ws:
-                event = json.loads(message)
-                event_type = event.get("type")
-
-                match event_type:
-                    case "session.created":
-                        session_id = event.get("session", {}).get("id")
-                        logger.info("[VoiceLiveACSHandler] Session ID: %s", session_id)
-
-                    case "input_audio_buffer.cleared":
-                        logger.info("Input Audio Buffer Cleared Message")
-
-                    case "input_audio_buffer.speech_started":
-                        logger.info(
-                            "Voice activity detection started at %s ms",
-                            event.get("audio_start_ms"),
-                        )
-                        await self.stop_audio()
-
-                    case "input_audio_buffer.speech_stopped":
-                        logger.info("Speech stopped")
-
-                    case "conversation.item.input_audio_transcription.completed":
-                        transcript = event.get("transcript")
-                        logger.info("User: %s", transcript)
-
-                    case "conversation.item.input_audio_transcription.failed":
-                        error_msg = event.get("error")
-                        logger.warning("Transcription Error: %s", error_msg)
-
-                    case "response.done":
-                        response = event.get("response", {})
-                        logger.info("Response Done: Id=%s", response.get("id"))
-                        if response.get("status_details"):
-                            logger.info(
-                                "Status Details: %s",
-                                json.dumps(response["status_details"], indent=2),
-                            )
-
-                    case "response.function_call_arguments.done":
-                        # Handle completed function call
-                        function_name = event.get("name")
-                        arguments = event.get("arguments")
-                        call_id = event.get("call_id")
-                        logger.info("🤖 FUNCTION CALLING: %s with arguments: %s", function_name, arguments)
-                        
-                        if function_name == "get_client_products_by_client_id":
-                            try:
-                                args_dict = json.loads(arguments) if isinstance(arguments, str) else arguments
-                                client_id = args_dict.get("client_id")
-                                logger.info(f"🔄 Executing function get_client_products_by_client_id with client ID: {client_id}")
-                                
-                                result = await get_client_products_by_client_id(client_id)
-                                
-                                logger.info(f"✅ Function executed. Sending result to model: {result}")
-                                
-                                # Send function result back to the model
-                                function_result_message = {
-                                    "type": "conversation.item.create",
-                                    "item": {
-                                        "type": "function_call_output",
-                                        "call_id": call_id,
-                                        "output": json.dumps(result)
-                                    }
-                                }
-                                await self._send_json(function_result_message)
-                                await self._send_json({"type": "response.create"})
-                                
-                            except Exception as e:
-                                logger.exception("❌ ERROR executing function: %s", e)
-                                error_result = {
-                                    "type": "conversation.item.create",
-                                    "item": {
-                                        "type": "function_call_output",
-                                        "call_id": call_id,
-                                        "output": json.dumps({"error": str(e)})
-                                    }
-                                }
-                                await self._send_json(error_result)
-                                await self._send_json({"type": "response.create"})
-                                
-                        elif function_name == "create_support_case":
-                            try:
-                                args_dict = json.loads(arguments) if isinstance(arguments, str) else arguments
-                                client_id = args_dict.get("client_id")
-                                description = args_dict.get("description")
-                                logger.info(f"🔄 Executing function create_support_case with client ID: {client_id}")
-                                
-                                result = await create_support_case(client_id, description)
-                                
-                                logger.info(f"✅ Support case created. Sending result to model: {result}")
-                                
-                                # Send function result back to the model
-                                function_result_message = {
-                                    "type": "conversation.item.create",
-                                    "item": {
-                                        "type": "function_call_output",
-                                        "call_id": call_id,
-                                        "output": json.dumps(result)
-                                    }
-                                }
-                                await self._send_json(function_result_message)
-                                await self._send_json({"type": "response.create"})
-                                
-                            except Exception as e:
-                                logger.exception("❌ ERROR creating support case: %s", e)
-                                error_result = {
-                                    "type": "conversation.item.create",
-                                    "item": {
-                                        "type": "function_call_output",
-                                        "call_id": call_id,
-                                        "output": json.dumps({"error": str(e)})
-                                    }
-                                }
-                                await self._send_json(error_result)
-                                await self._send_json({"type": "response.create"})
-
-                        elif function_name == "send_conversation_summary":
-                            try:
-                                args_dict = json.loads(arguments) if isinstance(arguments, str) else arguments
-                                client_id = args_dict.get("client_id")
-                                conversation_summary = args_dict.get("conversation_summary")
-                                logger.info(f"🔄 Executing function send_conversation_summary with client ID: {client_id}")
-                                logger.info(f"📄 Summary to send: {conversation_summary}")
-                                
-                                result = await send_conversation_summary(client_id, conversation_summary)
-                                
-                                logger.info(f"✅ Function send_conversation_summary completed. Result: {result}")
-                                
-                                # Send function result back to the model
-                                function_result_message = {
-                                    "type": "conversation.item.create",
-                                    "item": {
-                                        "type": "function_call_output",
-                                        "call_id": call_id,
-                                        "output": json.dumps(result)
-                                    }
-                                }
-                                await self._send_json(function_result_message)
-                                await self._send_json({"type": "response.create"})
-                                
-                            except Exception as e:
-                                logger.exception("❌ ERROR sending conversation summary: %s", e)
-                                error_result = {
-                                    "type": "conversation.item.create",
-                                    "item": {
-                                        "type": "function_call_output",
-                                        "call_id": call_id,
-                                        "output": json.dumps({"error": str(e)})
-                                    }
-                                }
-                                await self._send_json(error_result)
-                                await self._send_json({"type": "response.create"})
-
-                    case "response.audio_transcript.done":
-                        transcript = event.get("transcript")
-                        logger.info("AI: %s", transcript)
-                        await self.send_message(
-                            json.dumps({"Kind": "Transcription", "Text": transcript})
-                        )
-
-                    case "response.audio.delta":
-                        delta = event.get("delta")
-                        if self.is_raw_audio:
-                            audio_bytes = base64.b64decode(delta)
-                            await self.send_message(audio_bytes)
-                        else:
-                            await self.voicelive_to_acs(delta)
-
-                    case "error":
-                        logger.error("Voice Live Error: %s", event)
-
-                    case _:
+            # Tool calls run in this group so the loop keeps draining audio events meanwhile
+            async with asyncio.TaskGroup() as tool_group:
+                self._tool_group = tool_group
+                async for message in self.ws:
+                    event = _loads(message)
+                    event_type = event.get("type")
+
+                    handler = handlers.get(event_type)
+                    if handler is not None:
+                        await handler(event)
+                    else:
                         logger.debug(
                             "[VoiceLiveACSHandler] Other event: %s", event_type
                         )
         except Exception:
             logger.exception("[VoiceLiveACSHandler] Receiver loop error")
+        finally:
+            self._tool_group = None
+
+    async def _on_session_created(self, event):
+        session_id = event.get("session", {}).get("id")
+        logger.info("[VoiceLiveACSHandler] Session ID: %s", session_id)
+
+    async def _on_input_audio_buffer_cleared(self, event):
+        logger.info("Input Audio Buffer Cleared Message")
+
+    async def _on_speech_started(self, event):
+        logger.info(
+            "Voice activity detection started at %s ms",
+            event.get("audio_start_ms"),
+        )
+        await self.stop_audio()
+
+    async def _on_speech_stopped(self, event):
+        logger.info("Speech stopped")
+
+    async def _on_input_transcription_completed(self, event):
+        transcript = event.get("transcript")
+        logger.info("User: %s", transcript)
+
+    async def _on_input_transcription_failed(self, event):
+        error_msg = event.get("error")
+        logger.warning("Transcription Error: %s", error_msg)
+
+    async def _on_response_done(self, event):
+        response = event.get("response", {})
+        logger.info("Response Done: Id=%s", response.get("id"))
+        if response.get("status_details"):
+            logger.info(
+                "Status Details: %s",
+                json.dumps(response["status_details"], indent=2),
+            )
+
+    async def _on_function_call_arguments_done(self, event):
+        # Handle completed function call
+        function_name = event.get("name")
+        arguments = event.get("arguments")
+        call_id = event.get("call_id")
+        logger.info("🤖 FUNCTION CALLING: %s with arguments: %s", function_name, arguments)
+        self._tool_group.create_task(self._run_tool(function_name, arguments, call_id))
+
+    async def _on_audio_transcript_done(self, event):
+        transcript = event.get("transcript")
+        logger.info("AI: %s", transcript)
+        await self.send_message(
+            json.dumps({"Kind": "Transcription", "Text": transcript})
+        )
+
+    async def _on_audio_delta(self, event):
+        delta = event.get("delta")
+        if self.is_raw_audio:
+            audio_bytes = _b64decode(delta, validate=False)
+            await self.send_message(audio_bytes, is_audio=True)
+        else:
+            await self.voicelive_to_acs(delta)
 
-    async def send_message(self, message: Data):
-        """Sends data back to client WebSocket."""
+    async def _on_error(self, event):
+        logger.error("Voice Live Error: %s", event)
+
+    async def _run_tool(self, function_name, arguments, call_id):
+        """Runs a tool requested by the model and sends its output back to Voice Live."""
+        handler = _TOOL_HANDLERS.get(function_name)
+        if handler is None:
+            logger.warning("Unknown function requested: %s", function_name)
+            return
+
+        try:
+            args_dict = _loads(arguments) if isinstance(arguments, str) else arguments
+            logger.info("🔄 Executing function %s with client ID: %s", function_name, args_dict.get('client_id'))
+
+            result = await handler(args_dict)
+
+            logger.info("✅ Function %s completed. Sending result to model: %s", function_name, result)
+            output = _dumps(result).decode()
+        except Exception as e:
+            logger.exception("❌ ERROR executing function %s: %s", function_name, e)
+            output = _dumps({"error": str(e)}).decode()
+
+        # Send function result back to the model
+        function_result_message = {
+            "type": "conversation.item.create",
+            "item": {
+                "type": "function_call_output",
+                "call_id": call_id,
+                "output": output
+            }
+        }
+        await self._send_many([_dumps(function_result_message), _RESPONSE_CREATE_JSON])
+
+    async def send_message(self, message: Data, is_audio=False):
+        """Queues data to be sent back to client WebSocket."""
+        tx = self._tx
+        if is_audio:
+            if self._tx_audio < _TX_AUDIO_FRAMES:
+                self._tx_audio += 1
+            else:
+                # The client is not keeping up; drop the oldest audio frame rather than stall Voice Live
+                for i, (_, queued_audio) in enumerate(tx):
+                    if queued_audio:
+                        del tx[i]
+                        break
+        tx.append((message, is_audio))
+        self._tx_ready.set()
+
+    async def _writer_loop(self):
+        """Continuously sends queued messages to the client WebSocket."""
+        tx = self._tx
         try:
-            await self.incoming_websocket.send(message)
+            while True:
+                await self._tx_ready.wait()
+                while tx:
+                    message, is_audio = tx.popleft()
+                    if is_audio:
+                        self._tx_audio -= 1
+                    await self.incoming_websocket.send(message)
+                self._tx_ready.clear()
         except Exception:
+            # Logged once per connection: the loop ends on the first failed send
             logger.exception("[VoiceLiveACSHandler] Failed to send message")
 
+    async def close(self):
+        """Stops the background tasks and closes the Voice Live WebSocket."""
+        # connect_task first, so a connect still in flight never starts the loops below
+        for task in (self.connect_task, self._receiver_task, self.send_task, self._writer_task):
+            if task is not None:
+                task.cancel()
+        if self.ws:
+            await self.ws.close()
+
     async def voicelive_to_acs(self, base64_data):
         """Converts Voice Live audio delta to ACS audio message."""
-        try:
-            data = {
-                "Kind": "AudioData",
-                "AudioData": {"Data": base64_data},
-                "StopAudio": None,
-            }
-            await self.send_message(json.dumps(data))
-        except Exception:
-            logger.exception("[VoiceLiveACSHandler] Error in voicelive_to_acs")
+        await self.send_message("".join((_AUDIO_PREFIX, base64_data, _AUDIO_SUFFIX)), is_audio=True)
 
     async def stop_audio(self):
         """Sends a StopAudio signal to ACS."""
-        stop_audio_data = {"Kind": "StopAudio", "AudioData": None, "StopAudio": {}}
-        await self.send_message(json.dumps(stop_audio_data))
+        await self.send_message(_STOP_AUDIO_JSON)
 
     async def acs_to_voicelive(self, stream_data):
         """Processes audio from ACS and forwards to Voice Live if not silent."""
         try:
-            data = json.loads(stream_data)
+            if isinstance(stream_data, bytes):
+                stream_data = stream_data.decode("utf-8")
+            # ACS puts "kind" first, so control frames (AudioMetadata, DtmfData, ...) are
+            # rejected from the head of the frame without parsing it
+            if '"AudioData"' not in stream_data[:64]:
+                return
+            scanned = _scan_acs_audio(stream_data)
+            if scanned is not None:
+                audio_b64, silent = scanned
+                if not silent:
+                    await self.audio_to_voicelive(audio_b64.encode("ascii"))
+                return
+            data = _loads(stream_data)
             if data.get("kind") == "AudioData":
                 audio_data = data.get("audioData", {})
                 if not audio_data.get("silent", True):
-                    await self.audio_to_voicelive(audio_data.get("data"))
+                    await self.audio_to_voicelive(audio_data.get("data").encode("ascii"))
         except Exception:
             logger.exception("[VoiceLiveACSHandler] Error processing ACS audio")
 
     async def web_to_voicelive(self, audio_bytes):
         """Encodes raw audio bytes and sends to Voice Live API."""
-        audio_b64 = base64.b64encode(audio_bytes).decode("ascii")
+        audio_b64 = pybase64.b64encode(audio_bytes)
         await self.audio_to_voicelive(audio_b64)
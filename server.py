@@ -2,14 +2,27 @@
 import asyncio
 import logging
 import os
-import aiomysql
-from app.handler.acs_event_handler import AcsEventHandler
-from app.handler.acs_media_handler import ACSMediaHandler
 from dotenv import load_dotenv
 from quart import Quart, request, websocket
 
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+# Load .env before importing the handlers, which read their configuration at import time
 load_dotenv()
 
+from app.handler.acs_event_handler import AcsEventHandler  # noqa: E402
+from app.handler.acs_media_handler import (  # noqa: E402
+    ACSMediaHandler,
+    SETTINGS,
+    close_email_client,
+    close_pool,
+    close_redis,
+    get_pool,
+)
+
 app = Quart(__name__)
 
 app.config["AZURE_VOICE_LIVE_API_KEY"] = os.getenv("AZURE_VOICE_LIVE_API_KEY", "")
@@ -23,36 +36,30 @@ app.config["AZURE_USER_ASSIGNED_IDENTITY_CLIENT_ID"] = os.getenv(
 
 
 
+_CLIENT_PRODUCTS_QUERY = '''
+    SELECT p.name, p.type
+    FROM clients c
+    JOIN client_products cp ON c.id = cp.client_id
+    JOIN products p ON cp.product_id = p.id
+    WHERE c.client_id = %s
+'''
+
+
 # --- Function to get client products by ID ---
 async def get_client_products_by_client_id(client_id):
     """
     Get products contracted by a client given their ID.
     """
-    # The following parameters must be defined in the .env file:
-    # MYSQL_HOST, MYSQL_USER, MYSQL_PASSWORD, MYSQL_DB
-    mysql_host = os.getenv("MYSQL_HOST")
-    mysql_user = os.getenv("MYSQL_USER")
-    mysql_password = os.getenv("MYSQL_PASSWORD")
-    mysql_db = os.getenv("MYSQL_DB")
-    if not all([mysql_host, mysql_user, mysql_password, mysql_db]):
+    # MYSQL_HOST, MYSQL_USER, MYSQL_PASSWORD and MYSQL_DB must be defined in the .env file;
+    # they are read once at import into SETTINGS
+    if not SETTINGS.mysql_ready:
         return {"error": "Missing MySQL environment variables for connection"}
     try:
-        conn = await aiomysql.connect(
-            host=mysql_host,
-            user=mysql_user,
-            password=mysql_password,
-            db=mysql_db,
-        )
-        async with conn.cursor(aiomysql.DictCursor) as cur:
-            await cur.execute('''
-                SELECT p.name, p.type
-                FROM clients c
-                JOIN client_products cp ON c.id = cp.client_id
-                JOIN products p ON cp.product_id = p.id
-                WHERE c.client_id = %s
-            ''', (client_id,))
-            products = await cur.fetchall()
-        conn.close()
+        pool = await get_pool()
+        async with pool.acquire() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(_CLIENT_PRODUCTS_QUERY, (client_id,))
+                products = [{"name": name, "type": type_} for name, type_ in await cur.fetchall()]
         return {"products": products}
     except Exception as e:
         return {"error": str(e)}
@@ -110,6 +117,28 @@ if not app.config.get("ACS_CONNECTION_STRING"):
 
 acs_handler = AcsEventHandler(app.config)
 
+logger = logging.getLogger(__name__)
+_ACS_WS_LOG = logging.getLogger("acs_ws")
+_WEB_WS_LOG = logging.getLogger("web_ws")
+
+
+@app.before_serving
+async def open_connections():
+    """Opens the shared MySQL pool so the first call does not pay the connect cost."""
+    if SETTINGS.mysql_ready:
+        try:
+            await get_pool()
+        except Exception:
+            logger.exception("Could not open the MySQL pool at startup")
+
+
+@app.after_serving
+async def close_connections():
+    """Releases shared connections when the server shuts down."""
+    await close_pool()
+    await close_redis()
+    await close_email_client()
+
 
 @app.route("/acs/incomingcall", methods=["POST"])
 async def incoming_call_handler():
@@ -126,36 +155,41 @@ async def acs_event_callbacks(context_id):
     return await acs_handler.process_callback_events(context_id, raw_events, app.config)
 
 
-@app.websocket("/acs/ws")
-async def acs_ws():
-    """WebSocket endpoint for ACS to send audio to Voice Live."""
-    logger = logging.getLogger("acs_ws")
-    logger.info("Incoming ACS WebSocket connection")
+async def _serve_ws(ws_log, is_raw_audio, forward):
+    """
+    Runs one client WebSocket: connects to Voice Live and hands every received frame
+    to forward, an ACSMediaHandler method such as ACSMediaHandler.acs_to_voicelive.
+    """
     handler = ACSMediaHandler(app.config)
-    await handler.init_incoming_websocket(websocket, is_raw_audio=False)
-    asyncio.create_task(handler.connect())
+    await handler.init_incoming_websocket(websocket, is_raw_audio=is_raw_audio)
+    handler.connect_task = asyncio.create_task(handler.connect())
+    # Bound once so the per-frame loop does not resolve the websocket proxy each time
+    receive = websocket.receive
     try:
         while True:
-            msg = await websocket.receive()
-            await handler.acs_to_voicelive(msg)
+            await forward(handler, await receive())
+    except asyncio.CancelledError:
+        # Quart cancels the handler when the client disconnects; that is the normal way out
+        ws_log.debug("WebSocket connection closed")
+        raise
     except Exception:
-        logger.exception("ACS WebSocket connection closed")
+        ws_log.exception("WebSocket connection failed")
+    finally:
+        await handler.close()
+
+
+@app.websocket("/acs/ws")
+async def acs_ws():
+    """WebSocket endpoint for ACS to send audio to Voice Live."""
+    _ACS_WS_LOG.info("Incoming ACS WebSocket connection")
+    await _serve_ws(_ACS_WS_LOG, False, ACSMediaHandler.acs_to_voicelive)
 
 
 @app.websocket("/web/ws")
 async def web_ws():
     """WebSocket endpoint for web clients to send audio to Voice Live."""
-    logger = logging.getLogger("web_ws")
-    logger.info("Incoming Web WebSocket connection")
-    handler = ACSMediaHandler(app.config)
-    await handler.init_incoming_websocket(websocket, is_raw_audio=True)
-    asyncio.create_task(handler.connect())
-    try:
-        while True:
-            msg = await websocket.receive()
-            await handler.web_to_voicelive(msg)
-    except Exception:
-        logger.exception("Web WebSocket connection closed")
+    _WEB_WS_LOG.info("Incoming Web WebSocket connection")
+    await _serve_ws(_WEB_WS_LOG, True, ACSMediaHandler.web_to_voicelive)
 
 
 @app.route("/")
@@ -165,4 +199,8 @@ async def index():
 
 
 if __name__ == "__main__":
-    app.run(debug=True, host="0.0.0.0", port=8000)
+    # uvloop where installed (not on Windows); see the deployment notes in the README
+    loop = uvloop.new_event_loop() if uvloop is not None else None
+    # Debug mode (reloader, debug error pages) only for local development; deployments
+    # run under Hypercorn, see hypercorn.toml
+    app.run(debug=os.getenv("DEV", "").lower() in ("1", "true", "yes"), host="0.0.0.0", port=8000, loop=loop)
@@ -0,0 +1,74 @@
+"""_scan_acs_audio must agree with a full parse, or step aside so the caller parses."""
+
+import asyncio
+
+import pytest
+
+from app.handler.acs_media_handler import ACSMediaHandler, _scan_acs_audio
+
+COMPACT = '{"kind":"AudioData","audioData":{"timestamp":"2024-01-01T00:00:00Z","participantRawID":"8:acs:1","data":"AAEC/+==","silent":false}}'
+
+
+def test_compact_frame():
+    assert _scan_acs_audio(COMPACT) == ("AAEC/+==", False)
+
+
+def test_silent_frame():
+    frame = '{"kind":"AudioData","audioData":{"data":"AAEC","silent":true}}'
+    assert _scan_acs_audio(frame) == ("AAEC", True)
+
+
+def test_silent_before_data():
+    frame = '{"kind":"AudioData","audioData":{"silent":false,"data":"AAEC"}}'
+    assert _scan_acs_audio(frame) == ("AAEC", False)
+
+
+@pytest.mark.parametrize(
+    "frame",
+    [
+        # whitespace around the colons
+        '{"kind": "AudioData", "audioData": {"data": "AAEC", "silent": false}}',
+        '{"kind":"AudioData","audioData":{"data":"AAEC","silent" : false}}',
+        # escaped payload characters
+        '{"kind":"AudioData","audioData":{"data":"AA\\u002BC","silent":false}}',
+        '{"kind":"AudioData","audioData":{"data":"AA\\/C","silent":false}}',
+        # missing silent key
+        '{"kind":"AudioData","audioData":{"data":"AAEC"}}',
+        # non-audio kinds that carry a data field
+        '{"kind":"DtmfData","dtmfData":{"data":"5","silent":false}}',
+        '{"kind":"AudioMetadata","audioMetadata":{"data":"AAEC","silent":false}}',
+    ],
+)
+def test_unexpected_shapes_fall_back(frame):
+    assert _scan_acs_audio(frame) is None
+
+
+@pytest.mark.parametrize(
+    "frame, forwarded",
+    [
+        (COMPACT, b"AAEC/+=="),
+        ('{"kind": "AudioData", "audioData": {"data": "AAEC", "silent": false}}', b"AAEC"),
+        ('{"kind":"AudioData","audioData":{"data":"AA\\u002BC","silent":false}}', b"AA+C"),
+        ('{"kind":"AudioData","audioData":{"data":"AAEC"}}', None),
+        ('{"kind":"AudioData","audioData":{"data":"AAEC","silent":true}}', None),
+        ('{"kind":"DtmfData","dtmfData":{"data":"5","silent":false}}', None),
+        (COMPACT.encode(), b"AAEC/+=="),
+    ],
+)
+def test_acs_to_voicelive_forwards_the_same_audio(frame, forwarded):
+    handler = ACSMediaHandler(
+        {
+            "AZURE_VOICE_LIVE_ENDPOINT": "https://example",
+            "VOICE_LIVE_MODEL": "model",
+            "AZURE_VOICE_LIVE_API_KEY": "key",
+            "AZURE_USER_ASSIGNED_IDENTITY_CLIENT_ID": "",
+        }
+    )
+    sent = []
+
+    async def audio_to_voicelive(audio_b64):
+        sent.append(audio_b64)
+
+    handler.audio_to_voicelive = audio_to_voicelive
+    asyncio.run(handler.acs_to_voicelive(frame))
+    assert sent == ([forwarded] if forwarded is not None else [])
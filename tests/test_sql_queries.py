@@ -0,0 +1,42 @@
+"""The SQL constants must stay fixed text bound through %s parameters."""
+
+import ast
+import re
+from pathlib import Path
+
+import pytest
+
+from app.handler import acs_media_handler
+
+ROOT = Path(__file__).resolve().parent.parent
+SOURCES = [ROOT / "app" / "handler" / "acs_media_handler.py", ROOT / "server.py"]
+QUERY_NAME = re.compile(r"^_\w+_QUERY$")
+
+
+def _query_assignments(path):
+    tree = ast.parse(path.read_text(encoding="utf-8"))
+    for node in tree.body:
+        if isinstance(node, ast.Assign):
+            for target in node.targets:
+                if isinstance(target, ast.Name) and QUERY_NAME.match(target.id):
+                    yield target.id, node.value
+
+
+@pytest.mark.parametrize("path", SOURCES, ids=lambda p: p.name)
+def test_queries_are_plain_string_literals(path):
+    assignments = list(_query_assignments(path))
+    assert assignments
+    for name, value in assignments:
+        # f-strings, concatenation, % or .format() would all show up as non-constant nodes
+        assert isinstance(value, ast.Constant) and isinstance(value.value, str), name
+
+
+def test_queries_only_use_positional_placeholders():
+    queries = {
+        name: value for name, value in vars(acs_media_handler).items() if QUERY_NAME.match(name)
+    }
+    assert queries
+    for name, sql in queries.items():
+        assert "%s" in sql, name
+        assert "%" not in sql.replace("%s", ""), name
+        assert "{" not in sql and "}" not in sql, name